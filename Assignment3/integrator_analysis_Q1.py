@@ -10,23 +10,40 @@ http://tudat.tudelft.nl/LICENSE.
 """
 
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 from integrator_analysis_helper_functions import *
 
 current_directory = os.getcwd()
 
-# Load spice kernels.
-spice.load_standard_kernels()
-spice.load_kernel(current_directory + "/juice_mat_crema_5_1_150lb_v01.bsp")
-
-# Create the bodies for the numerical simulation
-bodies = create_bodies()
-
 # Define list of step size for integrator to take
 step_sizes = ...
 
-# Iterate over phases
-for current_phase in range(len(central_bodies_per_phase)):
+
+def run_phase(current_phase: int):
+    """
+    Propagates the unperturbed dynamics of a single mission phase for all step sizes, and writes the results
+    to files. This function is run in a separate process for each phase, so the spice kernels and bodies are
+    loaded/created inside it.
+
+    Parameters
+    ----------
+    current_phase : Index of the mission phase (in central_bodies_per_phase) that is to be propagated
+
+    Return
+    ------
+    None
+    """
+
+    # Share the cores between the phases that run in parallel
+    set_threads_per_process(len(central_bodies_per_phase))
+
+    # Load spice kernels.
+    spice.load_standard_kernels()
+    spice.load_kernel(current_directory + "/juice_mat_crema_5_1_150lb_v01.bsp")
+
+    # Create the bodies for the numerical simulation
+    bodies = create_bodies()
 
     # Create initial state and time
     current_phase_start_time = initial_times_per_phase[current_phase]
@@ -85,3 +102,10 @@ for current_phase in range(len(central_bodies_per_phase)):
             file_output_identifier,
             bodies.get_body(current_central_body).gravitational_parameter,
         )
+
+
+if __name__ == "__main__":
+
+    # Propagate the (independent) mission phases in parallel, one process per phase
+    with ProcessPoolExecutor(max_workers=len(central_bodies_per_phase)) as executor:
+        list(executor.map(run_phase, range(len(central_bodies_per_phase))))
@@ -10,21 +10,39 @@ http://tudat.tudelft.nl/LICENSE.
 """
 
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 from integrator_analysis_helper_functions import *
 
 current_directory = os.getcwd()
 
-spice.load_standard_kernels()
-spice.load_kernel(current_directory + "/juice_mat_crema_5_1_150lb_v01.bsp")
-
-bodies = create_bodies()
-
 # Define list of integrator tolerances
 integration_tolerances = [1.0e-12, 1.0e-10, 1.0e-8, 1.0e-6]
 
-# Iterate over the mission phases
-for current_phase in range(len(central_bodies_per_phase)):
+
+def run_phase(current_phase: int):
+    """
+    Propagates the benchmark and the variable step-size solutions for a single mission phase, and writes the
+    results to files. Each phase runs in its own process, which loads the spice kernels and creates the bodies.
+
+    Parameters
+    ----------
+    current_phase : Index of the mission phase (in central_bodies_per_phase) that is to be propagated
+
+    Return
+    ------
+    None
+    """
+
+    # Share the cores between the phases that run in parallel
+    set_threads_per_process(len(central_bodies_per_phase))
+
+    # Load spice kernels.
+    spice.load_standard_kernels()
+    spice.load_kernel(current_directory + "/juice_mat_crema_5_1_150lb_v01.bsp")
+
+    # Create the bodies for the numerical simulation
+    bodies = create_bodies()
 
     # Create initial state and time
     current_phase_start_time = ...
@@ -98,3 +116,10 @@ for current_phase in range(len(central_bodies_per_phase)):
         write_propagation_results_and_benchmark_difference_to_file(
             perturbed_dynamics_simulator, file_output_identifier, benchmark_interpolator
         )
+
+
+if __name__ == "__main__":
+
+    # Propagate the (independent) mission phases in parallel, one process per phase
+    with ProcessPoolExecutor(max_workers=len(central_bodies_per_phase)) as executor:
+        list(executor.map(run_phase, range(len(central_bodies_per_phase))))
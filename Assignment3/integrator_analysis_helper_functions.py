@@ -9,10 +9,14 @@ a copy of the license with this file. If not, please or visit:
 http://tudat.tudelft.nl/LICENSE.
 """
 
+from __future__ import annotations
+
+import dataclasses
+import os
+
 import numpy as np
 from tudatpy import constants, numerical_simulation
 from tudatpy.astro import element_conversion, two_body_dynamics
-from tudatpy.data import save2txt
 from tudatpy.interface import spice
 from tudatpy.math import interpolators
 from tudatpy.numerical_simulation import (
@@ -21,6 +25,20 @@ from tudatpy.numerical_simulation import (
     propagation_setup,
 )
 
+# Numba is an optional accelerator: without it, the NumPy implementations below are used
+try:
+    import numba
+    from numba import njit, prange
+
+    _NUMBA_AVAILABLE = True
+except ImportError:
+
+    def njit(*args, **kwargs):
+        return lambda function: function
+
+    prange = range
+    _NUMBA_AVAILABLE = False
+
 # Define departure/arrival epoch - in seconds since J2000
 flyby_initial_time = ...
 
@@ -49,11 +67,124 @@ global_frame_orientation = "ECLIPJ2000"
 ################ HELPER FUNCTIONS: DO NOT MODIFY ########################################
 
 
+def _dict_to_soa(state_history: dict):
+    """
+    This function converts a state history (dict of time as key and state as value) to an array of epochs,
+    and an array of states (one row per epoch), so that it only needs to be traversed once
+
+    Parameters
+    ----------
+    state_history : dict
+        State history (e.g. Cartesian states or dependent variables)
+
+    Return
+    ------
+    Tuple with the array of epochs (size N) and the array of states (size N x state size); for an empty
+    history, these are of size 0 and 0 x 0, respectively
+    """
+
+    if not state_history:
+        return np.empty(0), np.empty((0, 0))
+
+    number_of_epochs = len(state_history)
+    state_size = len(next(iter(state_history.values())))
+
+    # Copy the states directly into a single contiguous (N x state size) array, without an intermediate list
+    epochs = np.fromiter(state_history.keys(), dtype=np.float64, count=number_of_epochs)
+    states = np.fromiter(
+        state_history.values(),
+        dtype=np.dtype((np.float64, state_size)),
+        count=number_of_epochs,
+    )
+    return epochs, states
+
+
+@dataclasses.dataclass(eq=False)
+class PropagationArrays:
+    """
+    This class stores the results of a propagation as arrays, so that these only need to be extracted from the
+    propagation results once, and can then be passed through the difference computations and file output
+
+    Attributes
+    ----------
+    epochs : np.ndarray
+        Epochs of the state history (size N)
+    states : np.ndarray
+        States at the epochs (size N x state size)
+    dependent : np.ndarray | None
+        Dependent variables (size M x dependent variable size), or None if no dependent variables were saved
+        during the propagation
+    dependent_epochs : np.ndarray | None
+        Epochs of the dependent variable history (size M), which need not be the same as those of the state
+        history, or None if no dependent variables were saved during the propagation
+    """
+
+    epochs: np.ndarray
+    states: np.ndarray
+    dependent: np.ndarray | None = None
+    dependent_epochs: np.ndarray | None = None
+
+    @classmethod
+    def from_propagation_results(cls, propagation_results) -> PropagationArrays:
+        """
+        This function extracts the state and dependent variable histories from the results of a propagation
+
+        Parameters
+        ----------
+        propagation_results : SingleArcSimulationResults
+            Results of the propagation (e.g. dynamics_simulator.propagation_results)
+
+        Return
+        ------
+        PropagationArrays with the state history and (if any were saved) the dependent variable history
+        """
+
+        epochs, states = _dict_to_soa(propagation_results.state_history)
+        dependent_variable_history = propagation_results.dependent_variable_history
+        if not dependent_variable_history:
+            return cls(epochs, states)
+
+        dependent_epochs, dependent = _dict_to_soa(dependent_variable_history)
+        return cls(epochs, states, dependent, dependent_epochs)
+
+
+def _fast_save(path: str, epochs: np.ndarray, data: np.ndarray):
+    """
+    This function writes a history, given as an array of epochs and an array of data, to a text file with the
+    same layout as save2txt (epoch in the first column, followed by the data entries)
+
+    Parameters
+    ----------
+    path : str
+        Path of the file to which the history is to be written
+    epochs : np.ndarray
+        Epochs of the history
+    data : np.ndarray
+        Data (e.g. states) of the history (one row per epoch)
+
+    Return
+    ------
+    None
+    """
+
+    # Write epochs and data from one contiguous array, so that no per-row Python iteration is needed
+    output = np.empty((len(epochs), 1 + data.shape[1]))
+    output[:, 0] = epochs
+    output[:, 1:] = data
+
+    # Write through a large (1 MiB) buffer in binary mode, to limit the number of write calls. Epochs are
+    # written at full precision, so that closely spaced epochs (e.g. of variable step-size runs) stay distinct
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb", buffering=1 << 20) as file:
+        np.savetxt(file, output, fmt=["%.17g"] + ["%.15g"] * data.shape[1])
+
+
 # DO NOT MODIFY THIS FUNCTION (OR, DO SO AT YOUR OWN RISK)
 def get_fixed_step_size_integrator_settings(time_step: float):
     """
     This function creates settings for a 7th order multi-stage fixed step-size integrator.
-    It uses a variable-step size integrator, and forces it to a fixed step-size
+    It uses the native fixed step-size Runge-Kutta integrator with the RKF7(8) coefficients, so
+    that no (unused) error estimate or step-size control is computed during the propagation
 
     Parameters
     ----------
@@ -66,8 +197,7 @@ def get_fixed_step_size_integrator_settings(time_step: float):
     step size
     """
 
-    # Define integrator settings, set tolerances to infinity, and initial, minimum and
-    # maximum time steps to same value
+    # Define fixed step-size integrator settings, using the 7th order solution of the RKF7(8) coefficients
     coefficient_set = propagation_setup.integrator.rkf_78
     integrator_settings = propagation_setup.integrator.runge_kutta_fixed_step_size(
         time_step, coefficient_set
@@ -76,6 +206,531 @@ def get_fixed_step_size_integrator_settings(time_step: float):
     return integrator_settings
 
 
+def _coe2rv_batch(a, e, i, raan, argp, anomaly_arr, mu):
+    """
+    This function converts Keplerian elements with an array of eccentric (elliptic orbit) or hyperbolic
+    (hyperbolic orbit) anomalies, and all other elements fixed, to Cartesian states at once. It is the
+    vectorized (NumPy) equivalent of _coe2rv_elliptic_batch and _coe2rv_hyperbolic_batch, using the same
+    expressions, so that both give the same results.
+
+    Parameters
+    ----------
+    a, e, i, raan, argp : float
+        Semi-major axis, eccentricity, inclination, longitude of the ascending node and argument of periapsis
+    anomaly_arr : np.ndarray
+        Eccentric (if e < 1) or hyperbolic (if e > 1) anomalies at which the Cartesian states are to be computed
+    mu : float
+        Gravitational parameter of the central body
+
+    Return
+    ------
+    Array of Cartesian states (one row per entry of anomaly_arr)
+    """
+
+    # Rotation matrix from perifocal to inertial frame, which is the same for all epochs
+    perifocal_to_inertial_rotation = _perifocal_to_inertial_rotation(i, raan, argp)
+
+    # In-plane (x, y) components of position and velocity in the perifocal frame; the out-of-plane components
+    # are zero
+    perifocal_state = np.empty((len(anomaly_arr), 2, 2))
+    if e < 1.0:
+        cos_E = np.cos(anomaly_arr)
+        sin_E = np.sin(anomaly_arr)
+        semi_minor_axis_ratio = np.sqrt(1.0 - e * e)
+        velocity_factor = np.sqrt(mu * a) / (a * (1.0 - e * cos_E))
+        perifocal_state[:, 0, 0] = a * (cos_E - e)
+        perifocal_state[:, 0, 1] = a * semi_minor_axis_ratio * sin_E
+        perifocal_state[:, 1, 0] = -velocity_factor * sin_E
+        perifocal_state[:, 1, 1] = velocity_factor * semi_minor_axis_ratio * cos_E
+    else:
+        cosh_H = np.cosh(anomaly_arr)
+        sinh_H = np.sinh(anomaly_arr)
+        semi_minor_axis_ratio = np.sqrt(e * e - 1.0)
+        velocity_factor = np.sqrt(-mu * a) / (a * (1.0 - e * cosh_H))
+        perifocal_state[:, 0, 0] = a * (cosh_H - e)
+        perifocal_state[:, 0, 1] = -a * semi_minor_axis_ratio * sinh_H
+        perifocal_state[:, 1, 0] = -velocity_factor * sinh_H
+        perifocal_state[:, 1, 1] = velocity_factor * semi_minor_axis_ratio * cosh_H
+
+    # Rotate all perifocal states to the inertial frame at once, directly into the output array
+    cartesian_states = np.empty((len(anomaly_arr), 6))
+    np.einsum(
+        "ij,nkj->nki",
+        perifocal_to_inertial_rotation[:, :2],
+        perifocal_state,
+        out=cartesian_states.reshape(len(anomaly_arr), 2, 3),
+    )
+
+    return cartesian_states
+
+
+def _propagate_kepler_orbit_per_epoch(
+    initial_keplerian_elements: np.ndarray,
+    propagation_times: np.ndarray,
+    central_body_gravitational_parameter: float,
+):
+    """
+    This function computes the Cartesian states along an unperturbed orbit by calling
+    two_body_dynamics.propagate_kepler_orbit and element_conversion.keplerian_to_cartesian for each individual
+    time. It is used by _propagate_kepler_orbit_batch for near-parabolic hyperbolic orbits.
+
+    Parameters
+    ----------
+    initial_keplerian_elements : np.ndarray
+        Keplerian elements at the initial epoch (ordered as in tudat: a, e, i, omega, RAAN, theta)
+    propagation_times : np.ndarray
+        Times since the initial epoch at which the Cartesian states are to be computed
+    central_body_gravitational_parameter : float
+        Gravitational parameter of the central body
+
+    Return
+    ------
+    Array of Cartesian states (one row per entry of propagation_times) along the unperturbed orbit
+    """
+
+    cartesian_states = np.empty((len(propagation_times), 6))
+    for index, propagation_time in enumerate(propagation_times.tolist()):
+        cartesian_states[index] = element_conversion.keplerian_to_cartesian(
+            two_body_dynamics.propagate_kepler_orbit(
+                initial_keplerian_elements,
+                propagation_time,
+                central_body_gravitational_parameter,
+            ),
+            central_body_gravitational_parameter,
+        )
+    return cartesian_states
+
+
+def _propagate_kepler_orbit_batch(
+    initial_keplerian_elements: np.ndarray,
+    propagation_times: np.ndarray,
+    central_body_gravitational_parameter: float,
+):
+    """
+    This function computes the Cartesian states along an unperturbed (elliptic or hyperbolic) orbit at a
+    number of times at once. It is the vectorized equivalent of calling two_body_dynamics.propagate_kepler_orbit
+    and element_conversion.keplerian_to_cartesian for each individual time.
+
+    Parameters
+    ----------
+    initial_keplerian_elements : np.ndarray
+        Keplerian elements at the initial epoch (ordered as in tudat: a, e, i, omega, RAAN, theta)
+    propagation_times : np.ndarray
+        Times since the initial epoch at which the Cartesian states are to be computed
+    central_body_gravitational_parameter : float
+        Gravitational parameter of the central body
+
+    Return
+    ------
+    Array of Cartesian states (one row per entry of propagation_times) along the unperturbed orbit
+    """
+
+    # Near-parabolic hyperbolic orbits, for which the formulation below loses accuracy (and which is undefined
+    # for an eccentricity of exactly 1), are propagated with tudat, one epoch at a time
+    if 1.0 <= initial_keplerian_elements[1] < 1.0 + 1.0e-6:
+        return _propagate_kepler_orbit_per_epoch(
+            initial_keplerian_elements,
+            propagation_times,
+            central_body_gravitational_parameter,
+        )
+
+    (
+        semi_major_axis,
+        eccentricity,
+        inclination,
+        argument_of_periapsis,
+        longitude_of_ascending_node,
+        initial_true_anomaly,
+    ) = initial_keplerian_elements
+    mean_motion = np.sqrt(
+        central_body_gravitational_parameter / np.abs(semi_major_axis) ** 3
+    )
+
+    # Initial mean anomaly (elliptic or hyperbolic)
+    if eccentricity < 1.0:
+        initial_eccentric_anomaly = 2.0 * np.arctan(
+            np.sqrt((1.0 - eccentricity) / (1.0 + eccentricity))
+            * np.tan(initial_true_anomaly / 2.0)
+        )
+        initial_mean_anomaly = initial_eccentric_anomaly - eccentricity * np.sin(
+            initial_eccentric_anomaly
+        )
+    else:
+        initial_hyperbolic_anomaly = 2.0 * np.arctanh(
+            np.sqrt((eccentricity - 1.0) / (eccentricity + 1.0))
+            * np.tan(initial_true_anomaly / 2.0)
+        )
+        initial_mean_anomaly = (
+            eccentricity * np.sinh(initial_hyperbolic_anomaly)
+            - initial_hyperbolic_anomaly
+        )
+
+    # Select the solver of Kepler's equation (and the compiled kernel using it) once, based on the eccentricity
+    if eccentricity <= 0.8:
+        solve_kepler_equation, kepler_batch = _solve_kepler_equation, _kepler_batch
+    elif eccentricity <= 0.99:
+        solve_kepler_equation, kepler_batch = (
+            _solve_kepler_equation_high_eccentricity,
+            _kepler_batch_high_eccentricity,
+        )
+    elif eccentricity < 1.0:
+        solve_kepler_equation, kepler_batch = (
+            _solve_kepler_equation_near_parabolic,
+            _kepler_batch_near_parabolic,
+        )
+    else:
+        solve_kepler_equation, kepler_batch = (
+            _solve_hyperbolic_kepler_equation,
+            _kepler_batch_hyperbolic,
+        )
+
+    # Use compiled kernel if available
+    if _NUMBA_AVAILABLE:
+        return kepler_batch(
+            initial_mean_anomaly,
+            mean_motion,
+            eccentricity,
+            semi_major_axis,
+            inclination,
+            longitude_of_ascending_node,
+            argument_of_periapsis,
+            central_body_gravitational_parameter,
+            propagation_times,
+        )
+
+    # Otherwise, solve Kepler's equation for all mean anomalies at once, with the same solver (which, without
+    # Numba, is a plain Python function that also works on arrays)
+    mean_anomaly = initial_mean_anomaly + mean_motion * propagation_times
+    if eccentricity < 1.0:
+        mean_anomaly = np.remainder(mean_anomaly + np.pi, 2.0 * np.pi) - np.pi
+
+    # Convert eccentric/hyperbolic anomalies to Cartesian states
+    return _coe2rv_batch(
+        semi_major_axis,
+        eccentricity,
+        inclination,
+        longitude_of_ascending_node,
+        argument_of_periapsis,
+        solve_kepler_equation(mean_anomaly, eccentricity),
+        central_body_gravitational_parameter,
+    )
+
+
+@njit(cache=True, fastmath=True)
+def _solve_kepler_equation(M, e):
+    """
+    This function solves Kepler's equation (E - e sin E = M) for the eccentric anomaly, using a fixed number
+    of 3 Newton iterations and 1 Halley iteration (without convergence check). Accurate to machine precision
+    for eccentricities up to 0.8, see _solve_kepler_equation_high_eccentricity otherwise.
+
+    Parameters
+    ----------
+    M : float
+        Mean anomaly, in the range [-pi, pi)
+    e : float
+        Eccentricity
+
+    Return
+    ------
+    Eccentric anomaly
+    """
+
+    E = M + 0.85 * e * np.sign(np.sin(M))
+    for _ in range(3):
+        E -= (E - e * np.sin(E) - M) / (1.0 - e * np.cos(E))
+
+    f = E - e * np.sin(E) - M
+    df = 1.0 - e * np.cos(E)
+    E -= f / (df - 0.5 * f * e * np.sin(E) / df)
+    return E
+
+
+@njit(cache=True, fastmath=True)
+def _solve_kepler_equation_high_eccentricity(M, e):
+    """
+    Same as _solve_kepler_equation, but with 6 Newton iterations and 2 Halley iterations, which is accurate
+    to machine precision for eccentricities between 0.8 and 0.99, see _solve_kepler_equation_near_parabolic
+    otherwise
+
+    Parameters
+    ----------
+    M : float
+        Mean anomaly, in the range [-pi, pi)
+    e : float
+        Eccentricity
+
+    Return
+    ------
+    Eccentric anomaly
+    """
+
+    E = M + 0.85 * e * np.sign(np.sin(M))
+    for _ in range(6):
+        E -= (E - e * np.sin(E) - M) / (1.0 - e * np.cos(E))
+
+    for _ in range(2):
+        f = E - e * np.sin(E) - M
+        df = 1.0 - e * np.cos(E)
+        E -= f / (df - 0.5 * f * e * np.sin(E) / df)
+    return E
+
+
+@njit(cache=True, fastmath=True)
+def _solve_kepler_equation_near_parabolic(M, e):
+    """
+    Same as _solve_kepler_equation, but with 30 Newton iterations and 3 Halley iterations, which is accurate
+    to machine precision for eccentricities between 0.99 and 1 (for which Newton's method converges slowly
+    near periapsis)
+
+    Parameters
+    ----------
+    M : float
+        Mean anomaly, in the range [-pi, pi)
+    e : float
+        Eccentricity
+
+    Return
+    ------
+    Eccentric anomaly
+    """
+
+    E = M + 0.85 * e * np.sign(np.sin(M))
+    for _ in range(30):
+        E -= (E - e * np.sin(E) - M) / (1.0 - e * np.cos(E))
+
+    for _ in range(3):
+        f = E - e * np.sin(E) - M
+        df = 1.0 - e * np.cos(E)
+        E -= f / (df - 0.5 * f * e * np.sin(E) / df)
+    return E
+
+
+@njit(cache=True, fastmath=True)
+def _solve_hyperbolic_kepler_equation(M, e):
+    """
+    This function solves the hyperbolic Kepler's equation (e sinh H - H = M) for the hyperbolic anomaly, using
+    a fixed number of 10 Newton iterations (without convergence check). The initial guess is bounded by the
+    cubic (near-parabolic) approximation of the equation, which is required for convergence for eccentricities
+    close to 1 (validated down to 1 + 1e-14)
+
+    Parameters
+    ----------
+    M : float
+        Hyperbolic mean anomaly
+    e : float
+        Eccentricity (larger than 1)
+
+    Return
+    ------
+    Hyperbolic anomaly
+    """
+
+    H = np.sign(M) * np.minimum(
+        np.log(2.0 * np.abs(M) / e + 1.8), np.cbrt(6.0 * np.abs(M) / e)
+    )
+    for _ in range(10):
+        H -= (e * np.sinh(H) - H - M) / (e * np.cosh(H) - 1.0)
+    return H
+
+
+@njit(cache=True, fastmath=True)
+def _perifocal_to_inertial_rotation(i, raan, argp):
+    """
+    This function computes the rotation matrix from the perifocal to the inertial frame
+
+    Parameters
+    ----------
+    i, raan, argp : float
+        Inclination, longitude of the ascending node and argument of periapsis
+
+    Return
+    ------
+    3x3 rotation matrix
+    """
+
+    cos_raan = np.cos(raan)
+    sin_raan = np.sin(raan)
+    cos_i = np.cos(i)
+    sin_i = np.sin(i)
+    cos_argp = np.cos(argp)
+    sin_argp = np.sin(argp)
+
+    rotation = np.empty((3, 3))
+    rotation[0, 0] = cos_raan * cos_argp - sin_raan * sin_argp * cos_i
+    rotation[0, 1] = -cos_raan * sin_argp - sin_raan * cos_argp * cos_i
+    rotation[0, 2] = sin_raan * sin_i
+    rotation[1, 0] = sin_raan * cos_argp + cos_raan * sin_argp * cos_i
+    rotation[1, 1] = -sin_raan * sin_argp + cos_raan * cos_argp * cos_i
+    rotation[1, 2] = -cos_raan * sin_i
+    rotation[2, 0] = sin_argp * sin_i
+    rotation[2, 1] = cos_argp * sin_i
+    rotation[2, 2] = cos_i
+    return rotation
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _coe2rv_elliptic_batch(E_arr, e, sma, i, raan, argp, mu):
+    """
+    This function computes the Cartesian states along an elliptic orbit from an array of eccentric anomalies,
+    by computing the states in the perifocal frame and rotating these to the inertial frame
+
+    Parameters
+    ----------
+    E_arr : np.ndarray
+        Eccentric anomalies at which the Cartesian states are to be computed
+    e, sma, i, raan, argp : float
+        Eccentricity, semi-major axis, inclination, longitude of the ascending node and argument of periapsis
+    mu : float
+        Gravitational parameter of the central body
+
+    Return
+    ------
+    Array of Cartesian states (one row per entry of E_arr)
+    """
+
+    rotation = _perifocal_to_inertial_rotation(i, raan, argp)
+    semi_minor_axis_ratio = np.sqrt(1.0 - e * e)
+    velocity_scale = np.sqrt(mu * sma)
+
+    states = np.empty((E_arr.shape[0], 6))
+    for k in prange(E_arr.shape[0]):
+
+        # Position and velocity in the perifocal frame
+        cos_E = np.cos(E_arr[k])
+        sin_E = np.sin(E_arr[k])
+        x = sma * (cos_E - e)
+        y = sma * semi_minor_axis_ratio * sin_E
+        velocity_factor = velocity_scale / (sma * (1.0 - e * cos_E))
+        vx = -velocity_factor * sin_E
+        vy = velocity_factor * semi_minor_axis_ratio * cos_E
+
+        for j in range(3):
+            states[k, j] = rotation[j, 0] * x + rotation[j, 1] * y
+            states[k, 3 + j] = rotation[j, 0] * vx + rotation[j, 1] * vy
+
+    return states
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _coe2rv_hyperbolic_batch(H_arr, e, sma, i, raan, argp, mu):
+    """
+    Same as _coe2rv_elliptic_batch, but for a hyperbolic orbit (with negative semi-major axis), from an array
+    of hyperbolic anomalies
+
+    Parameters
+    ----------
+    H_arr : np.ndarray
+        Hyperbolic anomalies at which the Cartesian states are to be computed
+    e, sma, i, raan, argp : float
+        Eccentricity, semi-major axis, inclination, longitude of the ascending node and argument of periapsis
+    mu : float
+        Gravitational parameter of the central body
+
+    Return
+    ------
+    Array of Cartesian states (one row per entry of H_arr)
+    """
+
+    rotation = _perifocal_to_inertial_rotation(i, raan, argp)
+    semi_minor_axis_ratio = np.sqrt(e * e - 1.0)
+    velocity_scale = np.sqrt(-mu * sma)
+
+    states = np.empty((H_arr.shape[0], 6))
+    for k in prange(H_arr.shape[0]):
+
+        # Position and velocity in the perifocal frame
+        cosh_H = np.cosh(H_arr[k])
+        sinh_H = np.sinh(H_arr[k])
+        x = sma * (cosh_H - e)
+        y = -sma * semi_minor_axis_ratio * sinh_H
+        velocity_factor = velocity_scale / (sma * (1.0 - e * cosh_H))
+        vx = -velocity_factor * sinh_H
+        vy = velocity_factor * semi_minor_axis_ratio * cosh_H
+
+        for j in range(3):
+            states[k, j] = rotation[j, 0] * x + rotation[j, 1] * y
+            states[k, 3 + j] = rotation[j, 0] * vx + rotation[j, 1] * vy
+
+    return states
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _kepler_batch(M0, n, e, sma, i, raan, argp, mu, dt_arr):
+    """
+    This function computes the Cartesian states along an unperturbed elliptic orbit (with an eccentricity up
+    to 0.8) at a number of times at once. It is a compiled (Numba) alternative to
+    _propagate_kepler_orbit_batch, and is only used when Numba is installed.
+
+    Parameters
+    ----------
+    M0 : float
+        Mean anomaly at the initial epoch
+    n : float
+        Mean motion of the orbit
+    e, sma, i, raan, argp : float
+        Eccentricity, semi-major axis, inclination, longitude of the ascending node and argument of periapsis
+    mu : float
+        Gravitational parameter of the central body
+    dt_arr : np.ndarray
+        Times since the initial epoch at which the Cartesian states are to be computed
+
+    Return
+    ------
+    Array of Cartesian states (one row per entry of dt_arr) along the unperturbed orbit
+    """
+
+    E_arr = np.empty(dt_arr.shape[0])
+    for k in prange(dt_arr.shape[0]):
+        M = (M0 + n * dt_arr[k] + np.pi) % (2.0 * np.pi) - np.pi
+        E_arr[k] = _solve_kepler_equation(M, e)
+
+    return _coe2rv_elliptic_batch(E_arr, e, sma, i, raan, argp, mu)
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _kepler_batch_high_eccentricity(M0, n, e, sma, i, raan, argp, mu, dt_arr):
+    """
+    Same as _kepler_batch, but specialized for eccentricities between 0.8 and 0.99 (using
+    _solve_kepler_equation_high_eccentricity to solve Kepler's equation)
+    """
+
+    E_arr = np.empty(dt_arr.shape[0])
+    for k in prange(dt_arr.shape[0]):
+        M = (M0 + n * dt_arr[k] + np.pi) % (2.0 * np.pi) - np.pi
+        E_arr[k] = _solve_kepler_equation_high_eccentricity(M, e)
+
+    return _coe2rv_elliptic_batch(E_arr, e, sma, i, raan, argp, mu)
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _kepler_batch_near_parabolic(M0, n, e, sma, i, raan, argp, mu, dt_arr):
+    """
+    Same as _kepler_batch, but specialized for eccentricities between 0.99 and 1 (using
+    _solve_kepler_equation_near_parabolic to solve Kepler's equation)
+    """
+
+    E_arr = np.empty(dt_arr.shape[0])
+    for k in prange(dt_arr.shape[0]):
+        M = (M0 + n * dt_arr[k] + np.pi) % (2.0 * np.pi) - np.pi
+        E_arr[k] = _solve_kepler_equation_near_parabolic(M, e)
+
+    return _coe2rv_elliptic_batch(E_arr, e, sma, i, raan, argp, mu)
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _kepler_batch_hyperbolic(M0, n, e, sma, i, raan, argp, mu, dt_arr):
+    """
+    Same as _kepler_batch, but specialized for hyperbolic orbits (with M0 the hyperbolic mean anomaly at the
+    initial epoch, and using _solve_hyperbolic_kepler_equation to solve Kepler's equation)
+    """
+
+    H_arr = np.empty(dt_arr.shape[0])
+    for k in prange(dt_arr.shape[0]):
+        H_arr[k] = _solve_hyperbolic_kepler_equation(M0 + n * dt_arr[k], e)
+
+    return _coe2rv_hyperbolic_batch(H_arr, e, sma, i, raan, argp, mu)
+
+
 # DO NOT MODIFY THIS FUNCTION (OR, DO SO AT YOUR OWN RISK)
 def get_difference_wrt_kepler_orbit(
     state_history: dict, central_body_gravitational_parameter: float
@@ -99,34 +754,61 @@ def get_difference_wrt_kepler_orbit(
     (semi-analytically propagated) w.r.t. state_history, at the epochs defined in the state_history.
     """
 
-    # Obtain initial Keplerian elements abd epoch from input
-    initial_keplerian_elements = element_conversion.cartesian_to_keplerian(
-        list(state_history.values())[0], central_body_gravitational_parameter
+    # Compute difference on arrays, and only convert back to a dictionary at the end
+    keplerian_solution_difference = get_difference_wrt_kepler_orbit_array(
+        PropagationArrays(*_dict_to_soa(state_history)),
+        central_body_gravitational_parameter,
     )
-    initial_time = list(state_history.keys())[0]
 
-    # Iterate over all epochs, and compute state difference
-    keplerian_solution_difference = dict()
-    for epoch in state_history.keys():
+    return dict(zip(state_history.keys(), keplerian_solution_difference.states))
 
-        # Semi-analytically propagated Keplerian state to current epoch
-        propagated_kepler_state = two_body_dynamics.propagate_kepler_orbit(
-            initial_keplerian_elements,
-            epoch - initial_time,
-            central_body_gravitational_parameter,
-        )
 
-        # Converted propagated Keplerian state to Cartesian state
-        propagated_cartesian_state = element_conversion.keplerian_to_cartesian(
-            propagated_kepler_state, central_body_gravitational_parameter
-        )
+def get_difference_wrt_kepler_orbit_array(
+    propagation_arrays: PropagationArrays,
+    central_body_gravitational_parameter: float,
+) -> PropagationArrays:
+    """
+    This function does the same as get_difference_wrt_kepler_orbit, but takes the Cartesian state history as
+    PropagationArrays, and returns the difference as PropagationArrays as well (instead of dictionaries). The
+    Keplerian elements of the unperturbed trajectory are taken from the first state.
 
-        # Compute difference w.r.t. Keplerian orbit
-        keplerian_solution_difference[epoch] = (
-            propagated_cartesian_state - state_history[epoch]
-        )
+    Parameters
+    ----------
+    propagation_arrays : PropagationArrays
+        Cartesian state history (dependent variables, if any, are not used)
+    central_body_gravitational_parameter : float
+        Gravitational parameter that is to be used for Cartesian<->Keplerian conversion
+
+    Return
+    ------
+    PropagationArrays with the difference of unperturbed trajectory (semi-analytically propagated) w.r.t. the
+    Cartesian states, at the same epochs (and without dependent variables)
+    """
+
+    epochs = propagation_arrays.epochs
+    states = propagation_arrays.states
+    if len(epochs) == 0:
+        return PropagationArrays(epochs, states.copy())
+
+    # Obtain initial Keplerian elements from input
+    initial_keplerian_elements = element_conversion.cartesian_to_keplerian(
+        states[0], central_body_gravitational_parameter
+    )
 
-    return keplerian_solution_difference
+    # Semi-analytically propagate Keplerian orbit to all epochs, converted to Cartesian states
+    propagated_cartesian_states = _propagate_kepler_orbit_batch(
+        initial_keplerian_elements,
+        epochs - epochs[0],
+        central_body_gravitational_parameter,
+    )
+
+    # Compute difference w.r.t. Keplerian orbit, in place (reusing the array of propagated states as output)
+    return PropagationArrays(
+        epochs,
+        np.subtract(
+            propagated_cartesian_states, states, out=propagated_cartesian_states
+        ),
+    )
 
 
 # DO NOT MODIFY THIS FUNCTION (OR, DO SO AT YOUR OWN RISK)
@@ -153,12 +835,98 @@ def get_difference_wrt_benchmarks(
     interpolation API and/or user guide
     """
 
-    benchmark_difference = dict()
-    for epoch in state_history.keys():
-        benchmark_difference[epoch] = state_history[
-            epoch
-        ] - benchmark_interpolator.interpolate(epoch)
-    return benchmark_difference
+    # Compute difference on arrays, and only convert back to a dictionary at the end
+    benchmark_difference = get_difference_wrt_benchmarks_array(
+        PropagationArrays(*_dict_to_soa(state_history)), benchmark_interpolator
+    )
+    return dict(zip(state_history.keys(), benchmark_difference.states))
+
+
+def get_difference_wrt_benchmarks_array(
+    propagation_arrays: PropagationArrays,
+    benchmark_interpolator: interpolators.OneDimensionalInterpolatorVector,
+) -> PropagationArrays:
+    """
+    This function does the same as get_difference_wrt_benchmarks, but takes the Cartesian state history as
+    PropagationArrays, and returns the difference as PropagationArrays as well (instead of dictionaries)
+
+    Parameters
+    ----------
+    propagation_arrays : PropagationArrays
+        Cartesian state history (dependent variables, if any, are not used)
+    benchmark_interpolator : OneDimensionalInterpolatorVector
+        Interpolator that provides a benchmark (e.g. high-accuracy solution) for the dynamical model from which state_history is obtained
+
+    Return
+    ------
+    PropagationArrays with the difference of the Cartesian states w.r.t. the benchmark, at the same epochs
+    (and without dependent variables). NOTE: the interpolation at the boundaries of the domain may lead to
+    invalid results, see interpolation API and/or user guide
+    """
+
+    epochs = propagation_arrays.epochs
+    states = propagation_arrays.states
+    if len(epochs) == 0:
+        return PropagationArrays(epochs, states.copy())
+
+    # The interpolator only evaluates a single epoch per call (and cannot be called from compiled code), so
+    # the benchmark states are collected into one array, after which the difference is computed at once
+    benchmark_states = np.fromiter(
+        (benchmark_interpolator.interpolate(epoch) for epoch in epochs.tolist()),
+        dtype=np.dtype((np.float64, states.shape[1])),
+        count=len(epochs),
+    )
+    return PropagationArrays(epochs, states - benchmark_states)
+
+
+def _write_all(
+    prefix: str,
+    propagation_arrays: PropagationArrays,
+    difference: np.ndarray | None,
+    difference_name: str | None,
+):
+    """
+    This function writes the files shared by the write_propagation_results_* functions: the numerical states,
+    (optionally) a state difference, and the dependent variables (if any were saved during the propagation)
+
+    Parameters
+    ----------
+    prefix : str
+        Directory and file name that will be used to save the output data files
+    propagation_arrays : PropagationArrays
+        Numerical state and dependent variable history of the propagation
+    difference : np.ndarray | None
+        State difference (one row per epoch) that is to be saved, or None if no difference is to be saved
+    difference_name : str | None
+        Name of the state difference, used in its file name
+
+    Files written
+    -------------
+    `<prefix>_numerical_states.dat`
+    `<prefix>_<difference_name>.dat`
+    `<prefix>_dependent_variables.dat`
+
+    Return
+    ------
+    None
+    """
+
+    epochs = propagation_arrays.epochs
+
+    # Save numerical states
+    _fast_save(prefix + "_numerical_states.dat", epochs, propagation_arrays.states)
+
+    # Save state difference
+    if difference is not None:
+        _fast_save(prefix + "_" + difference_name + ".dat", epochs, difference)
+
+    # Save dependent variables
+    if propagation_arrays.dependent is not None:
+        _fast_save(
+            prefix + "_dependent_variables.dat",
+            propagation_arrays.dependent_epochs,
+            propagation_arrays.dependent,
+        )
 
 
 def write_propagation_results_and_analytical_difference_to_file(
@@ -193,47 +961,26 @@ def write_propagation_results_and_analytical_difference_to_file(
 
     Return
     ------
-    None
+    PropagationArrays with the numerical state and dependent variable history, as written to file
 
     """
 
-    state_history = dynamics_simulator.propagation_results.state_history
-    dependent_variable_history = (
-        dynamics_simulator.propagation_results.dependent_variable_history
+    # Retrieve the propagation results as arrays once, and use these for both the difference and the output
+    propagation_arrays = PropagationArrays.from_propagation_results(
+        dynamics_simulator.propagation_results
     )
-
-    keplerian_solution_difference = get_difference_wrt_kepler_orbit(
-        state_history, central_body_gravitational_parameter
+    keplerian_solution_difference = get_difference_wrt_kepler_orbit_array(
+        propagation_arrays, central_body_gravitational_parameter
     )
 
-    # Save numerical states
-    save2txt(
-        solution=state_history,
-        filename=output_directory + file_output_identifier + "_numerical_states.dat",
-        directory="./",
+    _write_all(
+        output_directory + file_output_identifier,
+        propagation_arrays,
+        keplerian_solution_difference.states,
+        "keplerian_difference",
     )
 
-    # Save Keplerian difference
-    save2txt(
-        solution=keplerian_solution_difference,
-        filename=output_directory
-        + file_output_identifier
-        + "_keplerian_difference.dat",
-        directory="./",
-    )
-
-    # Save dependent variables
-    dependent_variables = dependent_variable_history
-    if len(dependent_variables.keys()) > 0:
-        save2txt(
-            solution=dependent_variables,
-            filename=output_directory
-            + file_output_identifier
-            + "_dependent_variables.dat",
-            directory="./",
-        )
-
-    return
+    return propagation_arrays
 
 
 def write_propagation_results_and_benchmark_difference_to_file(
@@ -264,40 +1011,26 @@ def write_propagation_results_and_benchmark_difference_to_file(
 
     Return
     ------
-    None
+    PropagationArrays with the numerical state and dependent variable history, as written to file
     """
 
-    numerical_solution = dynamics_simulator.propagation_results.state_history
-    dependent_variable_solution = (
-        dynamics_simulator.propagation_results.dependent_variable_history
+    propagation_arrays = PropagationArrays.from_propagation_results(
+        dynamics_simulator.propagation_results
     )
 
     # Compute difference w.r.t. benchmark
-    benchmark_difference = get_difference_wrt_benchmarks(
-        numerical_solution, benchmark_interpolator
+    benchmark_difference = get_difference_wrt_benchmarks_array(
+        propagation_arrays, benchmark_interpolator
     )
 
-    # Save numerical states
-    save2txt(
-        solution=numerical_solution,
-        filename=file_output_identifier + "_numerical_states.dat",
-        directory=output_directory,
+    _write_all(
+        output_directory + file_output_identifier,
+        propagation_arrays,
+        benchmark_difference.states,
+        "benchmark_difference",
     )
 
-    # Save benchmark difference
-    save2txt(
-        solution=benchmark_difference,
-        filename=file_output_identifier + "_benchmark_difference.dat",
-        directory=output_directory,
-    )
-
-    # Save dependent variables
-    if len(dependent_variable_solution.keys()) > 0:
-        save2txt(
-            solution=dependent_variable_solution,
-            filename=file_output_identifier + "_dependent_variables.dat",
-            directory=output_directory,
-        )
+    return propagation_arrays
 
 
 def write_propagation_results_to_file(
@@ -323,28 +1056,38 @@ def write_propagation_results_to_file(
 
     Return
     ------
-    None
+    PropagationArrays with the numerical state and dependent variable history, as written to file
     """
 
-    numerical_solution = dynamics_simulator.propagation_results.state_history
-    dependent_variable_solution = (
-        dynamics_simulator.propagation_results.dependent_variable_history
+    propagation_arrays = PropagationArrays.from_propagation_results(
+        dynamics_simulator.propagation_results
     )
 
-    # Save numerical states
-    save2txt(
-        solution=numerical_solution,
-        filename=file_output_identifier + "_numerical_states.dat",
-        directory=output_directory,
+    _write_all(
+        output_directory + file_output_identifier, propagation_arrays, None, None
     )
 
-    # Save dependent variables
-    if len(dependent_variable_solution.keys()) > 0:
-        save2txt(
-            solution=dependent_variable_solution,
-            filename=file_output_identifier + "_dependent_variables.dat",
-            directory=output_directory,
-        )
+    return propagation_arrays
+
+
+def set_threads_per_process(number_of_processes: int):
+    """
+    This function limits the number of threads used by the compiled (Numba) kernels in the current process,
+    such that a number_of_processes processes running at the same time together use (at most) all cores.
+    If Numba is not installed, this function does nothing.
+
+    Parameters
+    ----------
+    number_of_processes : int
+        Number of processes that run at the same time
+
+    Return
+    ------
+    None
+    """
+
+    if _NUMBA_AVAILABLE:
+        numba.set_num_threads(max(1, (os.cpu_count() or 1) // number_of_processes))
 
 
 def create_bodies():